@@ -1,9 +1,21 @@
-from speech_to_text import speech_to_text
+import asyncio
+import sys
+
+from speech_to_text import aiter_file, speech_to_text_async
 from text_to_speech import generate_sound_files
 
 
+async def process_file(audio_file: str) -> None:
+    text = await speech_to_text_async(aiter_file(audio_file))
+    # TTS is blocking; run it in a thread so other transcriptions keep going
+    await asyncio.to_thread(generate_sound_files, text=text)
+
+
+async def main(audio_files: list[str]) -> None:
+    await asyncio.gather(*(process_file(f) for f in audio_files))
+
+
 if __name__ == "__main__":
-    AUDIO_FILE = "./harvard.wav"
+    AUDIO_FILES = sys.argv[1:] or ["./harvard.wav"]
 
-    text = speech_to_text(AUDIO_FILE)
-    generate_sound_files(text=text)
+    asyncio.run(main(AUDIO_FILES))
@@ -1,10 +1,13 @@
 import requests
-import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Create directory for audio files
+from requests.adapters import HTTPAdapter
+
+# Directory for audio files, created by main()
 audio_dir = Path("english_conversations")
-audio_dir.mkdir(exist_ok=True)
 
 # List of free English conversation audio URLs from Internet Archive
 audio_files = {
@@ -18,37 +21,42 @@ audio_files = {
     "75_Daily_Conversations.mp3": "https://archive.org/download/englishaudio/6%20-%2075%20Daily%20English%20Conversations%20Practice%20Learn%20English%20Speaking%20Practice.mp3",
 }
 
+# Shared session so every download reuses pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+MAX_WORKERS = 8
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Serializes console output from the worker threads
+print_lock = threading.Lock()
+
 def download_file(url, filename):
-    """Download a file with progress indication"""
+    """Download a file, returning its size in bytes (None on failure)"""
     try:
-        print(f"\n📥 Downloading: {filename}")
-        response = requests.get(url, stream=True)
+        with print_lock:
+            print(f"\n📥 Downloading: {filename}")
+        response = SESSION.get(url, stream=True)
         response.raise_for_status()
         
-        total_size = int(response.headers.get('content-length', 0))
-        
         file_path = audio_dir / filename
         
+        # Per-chunk progress lines would interleave across workers, so only the
+        # start/finish messages are printed and the body is copied straight from
+        # the raw stream in large chunks.
+        response.raw.decode_content = True
         with open(file_path, 'wb') as f:
-            if total_size == 0:
-                f.write(response.content)
-            else:
-                downloaded = 0
-                chunk_size = 8192
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        percent = (downloaded / total_size) * 100
-                        print(f"  Progress: {percent:.1f}% ({downloaded / 1024 / 1024:.1f} MB)", end='\r')
+            shutil.copyfileobj(response.raw, f, length=CHUNK_SIZE)
+            size = f.tell()
         
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
-        print(f"\n  ✅ Downloaded: {filename} ({file_size:.1f} MB)")
-        return True
+        with print_lock:
+            print(f"\n  ✅ Downloaded: {filename} ({size / (1024 * 1024):.1f} MB)")
+        return size
         
     except Exception as e:
-        print(f"\n  ❌ Error downloading {filename}: {e}")
-        return False
+        with print_lock:
+            print(f"\n  ❌ Error downloading {filename}: {e}")
+        return None
 
 def main():
     print("=" * 60)
@@ -81,18 +89,27 @@ def main():
         files_to_download = files_to_download[:num]
     
     # Download files
+    audio_dir.mkdir(exist_ok=True)
     print("\n" + "=" * 60)
     print(f"Downloading {len(files_to_download)} file(s)...")
     print("=" * 60)
     
     successful = 0
     failed = 0
+    sizes = {}  # filename -> bytes, reused for the summary instead of re-stat'ing
     
-    for filename, url in files_to_download:
-        if download_file(url, filename):
-            successful += 1
-        else:
-            failed += 1
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(download_file, url, filename)
+            for filename, url in files_to_download
+        ]
+        for (filename, _), future in zip(files_to_download, futures):
+            size = future.result()
+            if size is not None:
+                sizes[filename] = size
+                successful += 1
+            else:
+                failed += 1
     
     # Summary
     print("\n" + "=" * 60)
@@ -103,12 +120,11 @@ def main():
     print(f"📁 Files saved to: {audio_dir.absolute()}")
     
     # List downloaded files
-    downloaded_files = list(audio_dir.glob("*.mp3"))
-    if downloaded_files:
+    if sizes:
         print(f"\n📋 Downloaded files:")
-        for f in downloaded_files:
-            size = os.path.getsize(f) / (1024 * 1024)
-            print(f"  • {f.name} ({size:.1f} MB)")
+        for name, size in sizes.items():
+            print(f"  • {name} ({size / (1024 * 1024):.1f} MB)")
 
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
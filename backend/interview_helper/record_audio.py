@@ -1,10 +1,10 @@
 import sounddevice as sd
-import wave
+import soundfile as sf
 import numpy as np
 import sys
-import threading
 
-stop_flag = threading.Event()
+# Default upper bound on a single recording; the capture buffer is allocated up front
+MAX_SECONDS = 3600
 
 def list_devices():
     print("\n=== AUDIO DEVICES ===\n")
@@ -21,21 +21,7 @@ def get_device_info(device_id):
         return sd.query_devices(device_id)
 
 
-def record_loop(device_id, sample_rate, frames_buffer):
-    """Thread function that records audio in chunks until stop_flag is set."""
-    with sd.InputStream(
-        device=device_id,
-        samplerate=sample_rate,
-        channels=1,
-        dtype="float32",
-        blocksize=2048
-    ) as stream:
-        while not stop_flag.is_set():
-            data, overflow = stream.read(2048)
-            frames_buffer.append(data.copy())
-
-
-def record_audio(device_id=None, filename="recording.wav"):
+def record_audio(device_id=None, filename="recording.wav", max_seconds=MAX_SECONDS):
     device_info = get_device_info(device_id)
     sample_rate = int(device_info["default_samplerate"])
 
@@ -46,47 +32,55 @@ def record_audio(device_id=None, filename="recording.wav"):
 
     print("🔴 Recording... Press ENTER to stop.")
 
-    frames = []
-    stop_flag.clear()
-
-    # Start thread
-    t = threading.Thread(target=record_loop, args=(device_id, sample_rate, frames))
-    t.start()
-
-    input()  # Wait for second ENTER
-    stop_flag.set()
-    t.join()
+    # PortAudio's callback thread writes straight into a preallocated buffer,
+    # so there are no per-block allocations and no final concatenate pass.
+    # Capturing int16 lets PortAudio do the sample conversion in C.
+    buf = np.empty((max_seconds * sample_rate, 1), dtype=np.int16)
+    write_ptr = 0
+
+    def callback(indata, frames, time_info, status):
+        nonlocal write_ptr
+        n = min(frames, len(buf) - write_ptr)
+        buf[write_ptr:write_ptr + n] = np.frombuffer(indata, dtype=np.int16, count=n).reshape(-1, 1)
+        write_ptr += n
+        if n < frames:
+            raise sd.CallbackStop
+
+    with sd.RawInputStream(
+        device=device_id,
+        samplerate=sample_rate,
+        channels=1,
+        dtype="int16",
+        blocksize=2048,
+        callback=callback,
+    ):
+        input()  # Wait for second ENTER
 
     print("⏹ Stopped.")
 
-    if len(frames) == 0:
+    if write_ptr == 0:
         print("⚠ No audio captured!")
         return
 
-    audio = np.concatenate(frames, axis=0)
-    audio_int16 = (audio * 32767).astype(np.int16)
+    audio = buf[:write_ptr]
 
-    # SAVE WAV
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(audio_int16.tobytes())
+    # SAVE WAV straight from the NumPy buffer (no bytes round-trip)
+    sf.write(filename, audio, sample_rate, subtype="PCM_16")
 
     print(f"\n✅ Saved recording: {filename}")
     print(f"⏱ Duration: {len(audio) / sample_rate:.2f} seconds")
 
     # Playback
     if input("\n🔊 Play it? (y/n): ").strip().lower() == "y":
-        sd.play(audio_int16, sample_rate)
+        sd.play(audio, sample_rate)
         sd.wait()
         print("Done!")
 
 
 # MAIN
-# if __name__ == "__main__":
-list_devices()
-choice = input("\nEnter device index (ENTER for default): ").strip()
-device_id = int(choice) if choice else None
+if __name__ == "__main__":
+    list_devices()
+    choice = input("\nEnter device index (ENTER for default): ").strip()
+    device_id = int(choice) if choice else None
 
-record_audio(device_id, filename="recording.wav")
+    record_audio(device_id, filename="recording.wav")
@@ -1,17 +1,13 @@
 import sounddevice as sd
-import wave
+import soundfile as sf
 import numpy as np
-import threading
 import time
 
 # Audio recording parameters
 SAMPLE_RATE = 16000
 CHANNELS = 1
 OUTPUT_FILENAME = "recording2.wav"
-
-# Global variables
-recording = []
-stop_recording = threading.Event()
+MAX_SECONDS = 3600  # upper bound on a single recording; buffer is allocated up front
 
 def list_audio_devices():
     """List all available audio devices with index numbers"""
@@ -27,10 +23,18 @@ def list_audio_devices():
     
     return input_devices
 
+def amplitude_stats(audio):
+    """Return (max, mean) absolute amplitude from a single abs pass"""
+    # int32 so abs(-32768) doesn't wrap around in int16
+    magnitude = np.abs(audio, dtype=np.int32)
+    return magnitude.max(), magnitude.mean()
+
 def test_microphone(device_id=None):
     """Test if microphone is working"""
     print("\nTesting microphone for 3 seconds...")
-    test_data = []
+    n_blocks = int(3 * SAMPLE_RATE / 1024)
+    # The test length is known up front, so read straight into one buffer
+    audio_array = np.empty((n_blocks * 1024, CHANNELS), dtype=np.int16)
     
     try:
         with sd.InputStream(
@@ -40,13 +44,11 @@ def test_microphone(device_id=None):
             dtype='int16',
             blocksize=1024
         ) as stream:
-            for _ in range(int(3 * SAMPLE_RATE / 1024)):
+            for i in range(n_blocks):
                 data, overflowed = stream.read(1024)
-                test_data.append(data.copy())
+                audio_array[i * 1024:(i + 1) * 1024] = data
         
-        audio_array = np.concatenate(test_data, axis=0)
-        max_amp = np.max(np.abs(audio_array))
-        mean_amp = np.mean(np.abs(audio_array))
+        max_amp, mean_amp = amplitude_stats(audio_array)
         
         print(f"Max amplitude: {max_amp}")
         print(f"Mean amplitude: {mean_amp}")
@@ -62,26 +64,53 @@ def test_microphone(device_id=None):
         print(f"✗ Error testing device: {e}")
         return False
 
-def record_audio(device_id=None):
-    """Record audio from microphone"""
+def record_audio(device_id=None, max_seconds=MAX_SECONDS):
+    """Record audio from microphone until Enter is pressed (or max_seconds elapse)"""
+    # PortAudio's callback thread writes straight into a preallocated buffer,
+    # so there are no per-block allocations and no final concatenate pass.
+    buf = np.empty((max_seconds * SAMPLE_RATE, CHANNELS), dtype=np.int16)
+    write_ptr = 0
+    # Counted rather than printed: I/O on the audio thread causes more overruns
+    overflow_count = 0
+
+    def callback(indata, frames, time_info, status):
+        nonlocal write_ptr, overflow_count
+        if status.input_overflow:
+            overflow_count += 1
+        n = min(frames, len(buf) - write_ptr)
+        buf[write_ptr:write_ptr + n] = np.frombuffer(
+            indata, dtype=np.int16, count=n * CHANNELS
+        ).reshape(-1, CHANNELS)
+        write_ptr += n
+        if n < frames:
+            raise sd.CallbackStop
+
     print("\nRecording... Press Enter to stop.")
     try:
-        with sd.InputStream(
+        # blocksize=0 lets PortAudio pick the optimal (variable) block size for
+        # the requested low latency instead of forcing 64 ms blocks.
+        stream = sd.RawInputStream(
             device=device_id,
             samplerate=SAMPLE_RATE, 
             channels=CHANNELS, 
             dtype='int16',
-            blocksize=1024
-        ) as stream:
-            while not stop_recording.is_set():
-                data, overflowed = stream.read(1024)
-                if overflowed:
-                    print("!", end="", flush=True)
-                recording.append(data.copy())
+            blocksize=0,
+            latency='low',
+            callback=callback,
+        )
+        stream.start()
+        try:
+            input()
+        finally:
+            print("\nStopping recording...")
+            stream.stop()
+            stream.close()
     except Exception as e:
         print(f"\nError during recording: {e}")
     
-    print("\nStopping recording...")
+    if overflow_count:
+        print(f"⚠ {overflow_count} input overruns")
+    return buf[:write_ptr]
 
 # Main program
 if __name__ == "__main__":
@@ -126,23 +155,12 @@ if __name__ == "__main__":
     print("\n" + "="*50)
     input("Press ENTER to start recording...")
     
-    record_thread = threading.Thread(target=record_audio, args=(device_id,))
-    record_thread.start()
-    
-    # Wait for Enter key to stop
-    input()
-    
-    # Stop recording
-    stop_recording.set()
-    record_thread.join()
+    audio_data = record_audio(device_id)
     
     # Save the recording
-    if recording:
-        audio_data = np.concatenate(recording, axis=0)
-        
+    if len(audio_data):
         # Check audio levels
-        max_amplitude = np.max(np.abs(audio_data))
-        mean_amplitude = np.mean(np.abs(audio_data))
+        max_amplitude, mean_amplitude = amplitude_stats(audio_data)
         
         print(f"\nAudio Statistics:")
         print(f"  Max amplitude: {max_amplitude}")
@@ -151,12 +169,8 @@ if __name__ == "__main__":
         if max_amplitude < 100:
             print("\n⚠ WARNING: Very low audio levels detected!")
         
-        # Write WAV file
-        with wave.open(OUTPUT_FILENAME, 'wb') as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(2)
-            wf.setframerate(SAMPLE_RATE)
-            wf.writeframes(audio_data.tobytes())
+        # Write WAV file directly from the NumPy buffer
+        sf.write(OUTPUT_FILENAME, audio_data, SAMPLE_RATE, subtype="PCM_16")
         
         import os
         full_path = os.path.abspath(OUTPUT_FILENAME)
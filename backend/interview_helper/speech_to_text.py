@@ -1,25 +1,106 @@
+from __future__ import annotations
+
+import asyncio
 import os
 import dotenv
 import io
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator
 
-dotenv.load_dotenv()
+import httpx
 
-from deepgram import DeepgramClient
-from deepgram.environment import DeepgramClientEnvironment
+if TYPE_CHECKING:
+    from deepgram import AsyncDeepgramClient, DeepgramClient
 
-self_hosted_env = DeepgramClientEnvironment(
-    base="https://api.greenpt.ai/",
-    production="",
-    agent="",
-)
+GREENPT_BASE_URL = "https://api.greenpt.ai/"
 
 # Path to the audio file
 # AUDIO_FILE = "./harvard.wav"
 
-api_key = os.getenv("GREEN-PT-KEY") or os.getenv("DEEPGRAM_API_KEY")
+# Upload chunk size used when streaming audio files from disk
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Uploads up to this size (~30 s of 16 kHz mono PCM) skip the SDK and are
+# posted straight to the listen endpoint
+DIRECT_UPLOAD_MAX_BYTES = 1 << 20
+LISTEN_URL = GREENPT_BASE_URL + "v1/listen"
+LISTEN_PARAMS = {"model": "green-s", "smart_format": "true"}
+
+
+@lru_cache(maxsize=1)
+def _load_env() -> None:
+    """Load `.env` once, on first use rather than at import."""
+    dotenv.load_dotenv()
+
+
+def _get_api_key() -> str:
+    _load_env()
+    api_key = os.getenv("GREEN-PT-KEY") or os.getenv("DEEPGRAM_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found. Set GREEN-PT-KEY or DEEPGRAM_API_KEY in .env file")
+    return api_key
 
-if not api_key:
-    raise ValueError("API key not found. Set GREEN-PT-KEY or DEEPGRAM_API_KEY in .env file")
+
+@lru_cache(maxsize=1)
+def _environment():
+    from deepgram.environment import DeepgramClientEnvironment
+
+    return DeepgramClientEnvironment(
+        base=GREENPT_BASE_URL,
+        production="",
+        agent="",
+    )
+
+
+@lru_cache(maxsize=1)
+def _client() -> DeepgramClient:
+    """Return a process-wide Deepgram client.
+
+    Reusing one client keeps its keep-alive connection pool (and TLS sessions)
+    to the transcription host alive across requests. The SDK is imported here
+    so importing this module stays cheap until the first transcription.
+    """
+    from deepgram import DeepgramClient
+
+    return DeepgramClient(
+        api_key=_get_api_key(),
+        environment=_environment(),
+        httpx_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=16)),
+    )
+
+
+@lru_cache(maxsize=1)
+def _async_client() -> AsyncDeepgramClient:
+    """Async counterpart of `_client` for callers running on an event loop."""
+    from deepgram import AsyncDeepgramClient
+
+    return AsyncDeepgramClient(
+        api_key=_get_api_key(),
+        environment=_environment(),
+        httpx_client=httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=16)),
+    )
+
+
+@lru_cache(maxsize=1)
+def _http_client() -> httpx.AsyncClient:
+    """Plain HTTP client for the direct (SDK-free) transcription path."""
+    return httpx.AsyncClient(timeout=30.0)
+
+
+async def _transcribe_direct(audio_data: bytes, content_type: str) -> str:
+    """POST audio to the listen endpoint and read the transcript from the raw JSON.
+
+    Avoids the SDK's request/response model building, which dominates the
+    cost of short clips.
+    """
+    resp = await _http_client().post(
+        LISTEN_URL,
+        params=LISTEN_PARAMS,
+        headers={"Authorization": f"Token {_get_api_key()}", "Content-Type": content_type},
+        content=audio_data,
+    )
+    resp.raise_for_status()
+    return resp.json()["results"]["channels"][0]["alternatives"][0]["transcript"]
 
 
 def speech_to_text(audio_bytes: bytes) -> str:
@@ -33,11 +114,7 @@ def speech_to_text(audio_bytes: bytes) -> str:
         Transcribed text as string
     """
     try:
-        # Create a Deepgram client using the API key
-        deepgram = DeepgramClient(
-            api_key=api_key,
-            environment=self_hosted_env
-        )
+        deepgram = _client()
 
         # Transcribe the audio bytes directly
         response = deepgram.listen.v1.media.transcribe_file(
@@ -63,11 +140,8 @@ def speech_to_text(audio_bytes: bytes) -> str:
 
 def speech_to_text2(audio_data: bytes):
     try:
-        # STEP 1: Create a Deepgram client using the API key
-        deepgram = DeepgramClient(
-            api_key=api_key,
-            environment=self_hosted_env
-        )
+        # STEP 1: Reuse the shared Deepgram client
+        deepgram = _client()
         
         # STEP 2: Call the transcribe_file method with the audio data directly
         response = deepgram.listen.v1.media.transcribe_file(
@@ -86,4 +160,61 @@ def speech_to_text2(audio_data: bytes):
         
     except Exception as e:
         print(f"Exception: {e}")
-        raise  # Re-raise the exception so FastAPI can handle it
\ No newline at end of file
+        raise  # Re-raise the exception so FastAPI can handle it
+
+
+async def aiter_file(path, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an audio file in chunks so it can be uploaded without loading it whole.
+
+    The reads run on a worker thread so they don't block the event loop.
+    """
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def speech_to_text_async(
+    audio_data: bytes | AsyncIterator[bytes],
+    content_type: str = "audio/wav",
+) -> str:
+    """Non-blocking variant of `speech_to_text2`.
+
+    Awaiting this from an event loop lets several transcriptions (or other
+    network calls) overlap instead of running back to back. `audio_data` may
+    be raw bytes or an async iterator of chunks (see `aiter_file`), which is
+    streamed to the API as it is read.
+
+    Short byte payloads go straight to the listen endpoint; the SDK is used
+    for streamed/long audio and as a fallback when the direct call fails.
+    """
+    transcript = None
+    if isinstance(audio_data, bytes) and len(audio_data) <= DIRECT_UPLOAD_MAX_BYTES:
+        try:
+            transcript = await _transcribe_direct(audio_data, content_type)
+        except Exception as e:
+            print(f"Direct transcription failed, retrying via SDK: {e}")
+
+    try:
+        if transcript is None:
+            deepgram = _async_client()
+
+            response = await deepgram.listen.v1.media.transcribe_file(
+                request=audio_data,
+                model="green-s",
+                smart_format=True,
+            )
+
+            transcript = response.results.channels[0].alternatives[0].transcript
+
+        print("\n✅ Transcript extracted successfully!")
+        print(f"{'='*60}")
+        print(transcript)
+        print(f"{'='*60}\n")
+        return transcript
+
+    except Exception as e:
+        print(f"Exception: {e}")
+        raise
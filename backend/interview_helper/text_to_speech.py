@@ -1,19 +1,36 @@
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
 
-# Get API key
-ELEVEN_LABS_API_KEY = os.getenv("ELEVEN_LABS_API_KEY")
-
-if not ELEVEN_LABS_API_KEY:
-    raise ValueError("ELEVEN_LABS_API_KEY not found in .env file")
+def _get_api_key():
+    """Return the ElevenLabs API key, failing only when a call actually needs it"""
+    api_key = os.getenv("ELEVEN_LABS_API_KEY")
+    if not api_key:
+        raise ValueError("ELEVEN_LABS_API_KEY not found in .env file")
+    return api_key
 
 # ElevenLabs API endpoint
 ELEVEN_LABS_URL = "https://api.elevenlabs.io/v1/text-to-speech"
 
+# Chunk size used when streaming generated audio to disk
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Shared session so repeated API calls reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.5)),
+)
+
 # Available voice IDs (popular ones)
 VOICES = {
     "rachel": "21m00Tcm4TlvDq8ikWAM",
@@ -33,6 +50,10 @@ VOICES = {
     "liam": "TX3LPaxmHKxFdv7VOQHJ",
     "dorothy": "ThT5KcBeYPX3keUQqHPh",
 }
+VOICES = MappingProxyType(VOICES)
+
+# Preset list printed by generate_sound_files, built once at import
+_VOICE_LIST = "\n".join(f"   • {name}" for name in VOICES)
 
 def text_to_speech(
     text,
@@ -59,23 +80,23 @@ def text_to_speech(
     
     try:
         # Get voice ID if voice name was provided
-        if voice_id in VOICES:
-            actual_voice_id = VOICES[voice_id]
+        actual_voice_id = VOICES.get(voice_id, voice_id)
+        if actual_voice_id != voice_id:
             print(f"🎤 Voice: {voice_id} ({actual_voice_id})")
         else:
-            actual_voice_id = voice_id
             print(f"🎤 Voice ID: {actual_voice_id}")
         
         print(f"📝 Text: {text[:100]}{'...' if len(text) > 100 else ''}")
         print(f"🎵 Model: {model_id}")
         
-        # Prepare the request
-        url = f"{ELEVEN_LABS_URL}/{actual_voice_id}"
+        # Prepare the request; the /stream endpoint starts sending audio
+        # before the whole clip has been rendered server-side
+        url = f"{ELEVEN_LABS_URL}/{actual_voice_id}/stream"
         
         headers = {
             "Accept": "audio/mpeg",
             "Content-Type": "application/json",
-            "xi-api-key": ELEVEN_LABS_API_KEY
+            "xi-api-key": _get_api_key()
         }
         
         data = {
@@ -89,14 +110,15 @@ def text_to_speech(
         
         # Make the request
         print("🔄 Generating audio...")
-        response = requests.post(url, json=data, headers=headers)
+        response = SESSION.post(url, json=data, headers=headers, stream=True)
         
         if response.status_code == 200:
-            # Save the audio file
+            # Save the audio file as it arrives instead of buffering it in memory
+            response.raw.decode_content = True
             with open(output_file, "wb") as f:
-                f.write(response.content)
+                shutil.copyfileobj(response.raw, f, length=CHUNK_SIZE)
+                file_size = f.tell() / 1024  # KB
             
-            file_size = os.path.getsize(output_file) / 1024  # KB
             print(f"✅ Audio saved to: {output_file} ({file_size:.1f} KB)")
             return output_file
         else:
@@ -120,10 +142,10 @@ def list_available_voices():
         url = "https://api.elevenlabs.io/v1/voices"
         headers = {
             "Accept": "application/json",
-            "xi-api-key": ELEVEN_LABS_API_KEY
+            "xi-api-key": _get_api_key()
         }
         
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         
         if response.status_code == 200:
             voices = response.json().get("voices", [])
@@ -149,18 +171,15 @@ def get_voice_info(voice_id):
     """Get detailed info about a specific voice"""
     try:
         # Get voice ID if voice name was provided
-        if voice_id in VOICES:
-            actual_voice_id = VOICES[voice_id]
-        else:
-            actual_voice_id = voice_id
+        actual_voice_id = VOICES.get(voice_id, voice_id)
         
         url = f"https://api.elevenlabs.io/v1/voices/{actual_voice_id}"
         headers = {
             "Accept": "application/json",
-            "xi-api-key": ELEVEN_LABS_API_KEY
+            "xi-api-key": _get_api_key()
         }
         
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers)
         
         if response.status_code == 200:
             voice_data = response.json()
@@ -179,7 +198,7 @@ def get_voice_info(voice_id):
 
 # Main execution
 # if __name__ == "__main__":
-def generate_sound_files(text: str):
+def generate_sound_files(text: str, voices=("rachel",), max_workers=4):
     print("\n" + "="*60)
     print("ELEVENLABS TEXT-TO-SPEECH DEMO")
     print("="*60)
@@ -193,16 +212,25 @@ def generate_sound_files(text: str):
     
     # text = "Hello! This is a test of the ElevenLabs text to speech API. It can generate very natural sounding speech in multiple voices."
     
-    # Example 1: Female voice (Rachel)
-    text_to_speech(
-        text=text,
-        voice_id="rachel",
-        output_file="recordings/output_rachel.mp3"
-    )
+    # One HTTP round-trip per voice; run them concurrently over the shared SESSION
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                text_to_speech,
+                text=text,
+                voice_id=voice,
+                output_file=f"recordings/output_{voice}.mp3",
+            )
+            for voice in voices
+        ]
+    
+    print("\nGenerated files:")
+    for voice, future in zip(voices, futures):
+        output_file = future.result()
+        print(f"   • {voice}: {output_file or 'failed'}")
      
     print("\n" + "="*60)
     print("DEMO COMPLETED")
     print("="*60)
     print("\n💡 Available preset voices:")
-    for name, vid in VOICES.items():
-        print(f"   • {name}")
\ No newline at end of file
+    print(_VOICE_LIST)
\ No newline at end of file
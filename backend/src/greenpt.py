@@ -1,8 +1,11 @@
 import os
 import asyncio
-from typing import List, Dict, Any
+import logging
+import threading
+from typing import List, Dict, Any, AsyncIterator
 
 import httpx
+import orjson
 
 
 class GreenPTClient:
@@ -11,14 +14,34 @@ class GreenPTClient:
     Configure with environment variables:
     - `GREENPT_API_KEY`: API key
     - `GREENPT_API_URL`: base URL for the API (defaults to a common path)
+    - `GREENPT_PROMPT_CACHE`: set to `1` when the backing model accepts
+      `cache_control` markers on message content blocks
     """
 
-    def __init__(self, api_key: str | None = None, api_url: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_url: str | None = None,
+        prompt_cache: bool | None = None,
+    ):
         self.api_key = api_key or os.getenv("GREENPT_API_KEY")
         self.api_url = api_url or os.getenv(
             "GREENPT_API_URL", "https://api.greenpt.ai/v1/chat/completions"
         )
-        self._client = httpx.AsyncClient(timeout=30.0)
+        if prompt_cache is None:
+            prompt_cache = os.getenv("GREENPT_PROMPT_CACHE", "").lower() in ("1", "true", "yes")
+        self.prompt_cache = prompt_cache
+        # HTTP/2 multiplexes concurrent chat calls over one pooled connection,
+        # so only the first request pays the TCP/TLS handshake.
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+        )
 
     async def chat(self, messages: List[Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
         """Send a chat-style request to GreenPT.
@@ -26,10 +49,45 @@ class GreenPTClient:
         `messages` should be a list of objects like {"role": "user|assistant|system", "content": "..."}
         Returns the parsed JSON response (dict).
         """
+        body = orjson.dumps(self._payload(messages, **kwargs))
+        resp = await self._client.post(self.api_url, content=body, headers=self._headers())
+        if resp.status_code >= 400:  # pragma: no cover - diagnostic detail for the caller
+            raise _status_error(resp)
+        data = orjson.loads(resp.content)
+        if self.prompt_cache:
+            _log_cache_usage(data)
+        return data
+
+    async def chat_stream(
+        self, messages: List[Dict[str, str]], **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat completion, yielding each parsed server-sent-event chunk.
+
+        Chunks follow the OpenAI streaming shape (`choices[0].delta.content`).
+        """
+        body = orjson.dumps(self._payload(messages, **{**kwargs, "stream": True}))
+        async with self._client.stream(
+            "POST", self.api_url, content=body, headers=self._headers()
+        ) as resp:
+            if resp.status_code >= 400:
+                await resp.aread()
+                raise _status_error(resp)
+            async for line in resp.aiter_lines():
+                chunk = _parse_sse_line(line)
+                if chunk is not None:
+                    yield chunk
+
+    # Request bodies are encoded with orjson and sent as raw `content` (the
+    # headers already carry the JSON content type) rather than httpx's stdlib
+    # json encoding of the whole message history
+    def _payload(self, messages: List[Dict[str, str]], **kwargs: Any) -> Dict[str, Any]:
         if not self.api_key:
             raise RuntimeError("GREENPT_API_KEY not configured")
 
-        payload = {
+        if self.prompt_cache:
+            messages = _mark_system_prompt_cacheable(messages)
+
+        return {
             "model": kwargs.get("model", "green-l-raw"),
             "messages": messages,
             "temperature": kwargs.get("temperature", 0.7),
@@ -37,31 +95,92 @@ class GreenPTClient:
             "stream": kwargs.get("stream", False),
         }
 
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        resp = await self._client.post(self.api_url, json=payload, headers=headers)
-        try:
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as exc:  # pragma: no cover - diagnostic detail for the caller
-            detail = exc.response.text
-            raise httpx.HTTPStatusError(
-                f"{exc} | Response body: {detail}", request=exc.request, response=exc.response
-            )
-        return resp.json()
-
     async def close(self) -> None:
         await self._client.aclose()
 
 
-# convenience singleton for simple apps
+def _status_error(resp: httpx.Response) -> httpx.HTTPStatusError:
+    """Build the error for a failed GreenPT call, including the response body."""
+    return httpx.HTTPStatusError(
+        f"GreenPT returned {resp.status_code} for {resp.request.url} | Response body: {resp.text}",
+        request=resp.request,
+        response=resp,
+    )
+
+
+def _mark_system_prompt_cacheable(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return `messages` with the leading system messages marked for prompt caching.
+
+    The system prompt and the assets message after it are the same on every
+    turn of a session, so providers that honour `cache_control` can skip
+    re-prefilling them. The breakpoint goes on the last leading system
+    message, which caches the whole block. Builds a new list and message;
+    the session's cached history is passed in directly and must not be
+    mutated.
+    """
+    n = 0
+    while n < len(messages) and messages[n].get("role") == "system":
+        n += 1
+    if not n or not isinstance(messages[n - 1].get("content"), str):
+        return messages
+    marked = {
+        "role": "system",
+        "content": [
+            {
+                "type": "text",
+                "text": messages[n - 1]["content"],
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+    }
+    return [*messages[: n - 1], marked, *messages[n:]]
+
+
+def _log_cache_usage(data: Dict[str, Any]) -> None:
+    """Log prompt-cache hits/writes reported in the response's `usage` block."""
+    usage = data.get("usage") or {}
+    read = usage.get("cache_read_input_tokens")
+    if read is None:
+        read = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    created = usage.get("cache_creation_input_tokens")
+    if read is not None or created is not None:
+        logging.debug("GreenPT prompt cache: read=%s created=%s", read, created)
+
+
+def _parse_sse_line(line: str) -> Dict[str, Any] | None:
+    """Decode one `data: {...}` SSE line; returns None for keep-alives and `[DONE]`."""
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    return orjson.loads(data)
+
+
+# convenience singleton for simple apps; the FastAPI lifespan creates it eagerly
+# at startup, the lock covers callers on other threads
 _client: GreenPTClient | None = None
+_client_lock = threading.Lock()
 
 
 def get_client() -> GreenPTClient:
     global _client
     if _client is None:
-        _client = GreenPTClient()
+        with _client_lock:
+            if _client is None:
+                _client = GreenPTClient()
     return _client
+
+
+async def close_client() -> None:
+    """Close the singleton's connection pool; the next `get_client()` builds a fresh one."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
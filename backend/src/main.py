@@ -1,30 +1,145 @@
-from typing import Optional, Any
+from typing import Optional, Any, AsyncIterator, BinaryIO, Dict, Iterable, List
 import asyncio
+import functools
+import hashlib
+import io
+import itertools
+import multiprocessing
 import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-import io
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+import orjson
 
 from dotenv import load_dotenv
 import logging
 
-from .sessions import create_session, get_session, append_message, set_assets, set_system_prompt
-from .greenpt import get_client
+from .sessions import (
+    create_session,
+    get_session,
+    append_message,
+    append_messages,
+    set_assets,
+    set_system_prompt,
+    session_lock,
+    prune_history,
+    save_session,
+    init_store,
+    close_store,
+    uses_redis,
+)
+from .greenpt import get_client, close_client
 from .prompt_store import get_prompt, DEFAULT_PROMPT
 
+# Imported up front so the first audio request doesn't pay for it; the module
+# defers loading the Deepgram SDK until the first transcription. The relative
+# form covers running the app as `backend.src.main` from the repo root.
+try:
+    from interview_helper.speech_to_text import speech_to_text_async
+except ImportError:
+    from ..interview_helper.speech_to_text import speech_to_text_async
+
 # NEW: imports for CV text extraction
 from pypdf import PdfReader
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional; pypdf handles PDFs on its own
+    pdfium = None
 import docx as docx_lib
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
 
 base_path = Path(__file__).resolve()
 load_dotenv(base_path.parents[2] / ".env")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Interview Practice Backend")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the GreenPT client, session store connection and PDF worker pool
+    on the worker's running loop and close them on shutdown."""
+    global PDF_PAGE_EXECUTOR
+    get_client()
+    await init_store()
+    # Started from a fork server rather than forked from this process, which
+    # already runs the CV extraction threads (and whatever locks they hold)
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    PDF_PAGE_EXECUTOR = ProcessPoolExecutor(
+        max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context(method)
+    )
+    try:
+        yield
+    finally:
+        # waits for running batches, so off the event loop
+        executor, PDF_PAGE_EXECUTOR = PDF_PAGE_EXECUTOR, None
+        await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+        await close_client()
+        await close_store()
+
+
+app = FastAPI(
+    title="Interview Practice Backend",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Reject oversized CV uploads from the Content-Length header, before the
+# multipart body is read and spooled. Chunked uploads carry no Content-Length;
+# those are spooled in full and caught by _check_cv_upload instead.
+MAX_CV_UPLOAD_BYTES = 10 * 1024 * 1024
+CV_UPLOAD_PATHS = {"/cv-text", "/session-from-upload"}
+
+# CVs rarely run past a few pages; anything far longer is almost certainly not
+# a CV, so extraction stops here instead of parsing the whole document
+MAX_CV_PAGES = 20
+MAX_CV_PARAGRAPHS = 5000
+
+# Text kept from a CV when creating a session: the interview prompt uses the
+# first 4000 characters (see sessions.set_assets), the evaluation up to this
+# much, so extraction stops once it has it
+MAX_CV_CHARS = 8000
+
+# Leading bytes of each supported CV format. Checked instead of the client's
+# Content-Type, which is often a generic application/octet-stream for DOCX
+CV_MAGIC_BYTES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",  # DOCX is a zip archive
+}
+
+
+class LimitCVUploadSize:
+    """Answer 413 for CV uploads whose Content-Length is over the limit.
+
+    Plain ASGI rather than `@app.middleware("http")`, so every other request
+    (the SSE streams in particular) passes straight through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in CV_UPLOAD_PATHS:
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > MAX_CV_UPLOAD_BYTES:
+                response = ORJSONResponse(
+                    status_code=413,
+                    content={"detail": f"CV upload exceeds {MAX_CV_UPLOAD_BYTES // (1024 * 1024)} MB."},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+# Added before CORS so that CORS (the outer middleware) also wraps the 413
+app.add_middleware(LimitCVUploadSize)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[os.getenv("CORS_ORIGIN", "http://localhost:3000")],
@@ -48,28 +163,198 @@ def _get_ext(filename: str) -> str:
     return os.path.splitext(filename.lower())[1]
 
 
-def extract_text_from_cv_file(filename: str, data: bytes) -> str:
+# Dedicated pool for CV parsing, bounded by core count so a burst of uploads
+# can't take over the default executor
+CV_EXTRACT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="cv-extract"
+)
+
+# pypdf text extraction is pure Python and GIL-bound, so longer PDFs are split
+# into page batches and extracted in worker processes. The pool is created by
+# `lifespan`; outside the app (e.g. the test harness) the batches run inline.
+PDF_PAGES_PER_BATCH = 10
+PDF_PAGE_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+async def _extract_cv_text(cv: UploadFile, max_chars: Optional[int] = None) -> str:
+    """Run `extract_text_from_cv_file` on the upload without blocking the event loop."""
+    await cv.seek(0)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        CV_EXTRACT_EXECUTOR, _extract_text_cached, cv.filename or "", cv.file, max_chars
+    )
+
+
+# Extracted text keyed by (content hash, extension), so re-uploading the same
+# file (retries, debugging) skips parsing entirely
+CV_TEXT_CACHE_SIZE = 128
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+_CV_TEXT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_CV_TEXT_CACHE_LOCK = threading.Lock()
+
+
+def _hash_file(fileobj: BinaryIO) -> str:
+    """blake2b digest of `fileobj`, read in chunks; rewinds the file afterwards."""
+    h = hashlib.blake2b(digest_size=16)
+    while chunk := fileobj.read(HASH_CHUNK_SIZE):
+        h.update(chunk)
+    fileobj.seek(0)
+    return h.hexdigest()
+
+
+def _extract_text_cached(filename: str, fileobj: BinaryIO, max_chars: Optional[int] = None) -> str:
+    key = (_hash_file(fileobj), _get_ext(filename), max_chars)
+    with _CV_TEXT_CACHE_LOCK:
+        text = _CV_TEXT_CACHE.get(key)
+        if text is not None:
+            _CV_TEXT_CACHE.move_to_end(key)
+            return text
+
+    # Failures raise HTTPException and are deliberately not cached
+    text = extract_text_from_cv_file(filename, fileobj, max_chars)
+    with _CV_TEXT_CACHE_LOCK:
+        _CV_TEXT_CACHE[key] = text
+        if len(_CV_TEXT_CACHE) > CV_TEXT_CACHE_SIZE:
+            _CV_TEXT_CACHE.popitem(last=False)
+    return text
+
+
+def _check_cv_upload(cv: UploadFile) -> None:
+    """Reject oversized or unsupported CV uploads by size, extension and leading bytes before parsing."""
+    if cv.size is not None and cv.size > MAX_CV_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"CV upload exceeds {MAX_CV_UPLOAD_BYTES // (1024 * 1024)} MB.",
+        )
+    ext = _get_ext(cv.filename or "")
+    magic = CV_MAGIC_BYTES.get(ext)
+    if magic is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported CV file type: {ext}. Please upload a PDF or DOCX.",
+        )
+    head = cv.file.read(len(magic))
+    cv.file.seek(0)
+    if head != magic:
+        raise HTTPException(
+            status_code=400,
+            detail=f"CV file content does not match a {ext} file.",
+        )
+
+
+def _join_upto(parts: Iterable[str], max_chars: Optional[int]) -> str:
+    """Newline-join `parts`, pulling no more once `max_chars` characters are in hand.
+
+    `parts` is consumed lazily, so with a generator the remaining pages or
+    paragraphs are never extracted at all.
+    """
+    if max_chars is None:
+        return "\n".join(parts)
+    taken: List[str] = []
+    total = 0
+    for part in parts:
+        taken.append(part)
+        total += len(part) + 1
+        if total >= max_chars:
+            break
+    return "\n".join(taken)
+
+
+def _pages_text(reader: PdfReader, start: int, stop: int, max_chars: Optional[int] = None) -> str:
+    return _join_upto(
+        ((reader.pages[i].extract_text() or "") for i in range(start, stop)), max_chars
+    )
+
+
+def _extract_pdf_pages(data: bytes, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) of a PDF (runs in a worker process).
+
+    PdfReader objects can't be pickled, so each worker re-opens the document
+    from the raw bytes.
+    """
+    return _pages_text(PdfReader(io.BytesIO(data)), start, stop)
+
+
+# PDFium is not thread-safe and CV_EXTRACT_EXECUTOR runs several extractions
+# at once, so every pdfium call goes through this lock
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _extract_pdf_text_pdfium(data: bytes, max_chars: Optional[int] = None) -> str:
+    """Extract text with PDFium (C++), an order of magnitude faster than pypdf."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            parts = []
+            total = 0
+            for i in range(min(len(pdf), MAX_CV_PAGES)):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_bounded())
+                textpage.close()
+                page.close()
+                total += len(parts[-1]) + 1
+                if max_chars is not None and total >= max_chars:
+                    break
+            return "\n".join(parts)
+        finally:
+            pdf.close()
+
+
+def _extract_pdf_text(fileobj: BinaryIO, max_chars: Optional[int] = None) -> str:
+    data = fileobj.read()
+    if pdfium is not None:
+        try:
+            return _extract_pdf_text_pdfium(data, max_chars)
+        except Exception as e:
+            logging.warning("pdfium extraction failed, falling back to pypdf: %s", e)
+
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = min(len(reader.pages), MAX_CV_PAGES)
+    # Not worth the round-trip to a worker process for the first batch; with a
+    # character cap it often holds all the text that's needed anyway
+    head = _pages_text(reader, 0, min(n_pages, PDF_PAGES_PER_BATCH), max_chars)
+    if n_pages <= PDF_PAGES_PER_BATCH or (max_chars is not None and len(head) >= max_chars):
+        return head
+
+    starts = range(PDF_PAGES_PER_BATCH, n_pages, PDF_PAGES_PER_BATCH)
+    stops = [min(start + PDF_PAGES_PER_BATCH, n_pages) for start in starts]
+    executor = PDF_PAGE_EXECUTOR
+    if executor is None:
+        rest = map(functools.partial(_pages_text, reader), starts, stops)
+    else:
+        rest = executor.map(_extract_pdf_pages, itertools.repeat(data), starts, stops)
+    return "\n".join([head, *rest])
+
+
+def extract_text_from_cv_file(filename: str, fileobj: BinaryIO, max_chars: Optional[int] = None) -> str:
     """Very simple text extractor for CV files.
 
-    Supports: .pdf, .docx
+    Supports: .pdf, .docx. DOCX files are read in place from `fileobj` (e.g.
+    an UploadFile's spooled temp file); PDFs are read into bytes so page
+    batches can be shipped to worker processes. With `max_chars`, extraction
+    stops once that much text has been collected and the result is cut to it.
     """
     ext = _get_ext(filename)
 
     if ext == ".pdf":
-        reader = PdfReader(io.BytesIO(data))
-        parts = []
-        for page in reader.pages:
-            txt = page.extract_text() or ""
-            parts.append(txt)
-        text = "\n".join(parts).strip()
+        text = _extract_pdf_text(fileobj, max_chars)[:max_chars].strip()
         if not text:
             raise HTTPException(status_code=400, detail="Could not extract text from PDF CV.")
         return text
 
     elif ext == ".docx":
-        doc = docx_lib.Document(io.BytesIO(data))
-        parts = [para.text for para in doc.paragraphs if para.text]
-        text = "\n".join(parts).strip()
+        doc = docx_lib.Document(fileobj)
+        # `doc.paragraphs` wraps every paragraph up front; walking the body's
+        # <w:p> elements lazily means only the paragraphs used are wrapped and
+        # have their text assembled
+        paragraphs = itertools.islice(
+            doc.element.body.iterchildren(qn("w:p")), MAX_CV_PARAGRAPHS
+        )
+        text = _join_upto(
+            (para_text for p in paragraphs if (para_text := Paragraph(p, doc).text)),
+            max_chars,
+        )[:max_chars].strip()
         if not text:
             raise HTTPException(status_code=400, detail="Could not extract text from DOCX CV.")
         return text
@@ -81,6 +366,17 @@ def extract_text_from_cv_file(filename: str, data: bytes) -> str:
         )
 
 
+# Where assistant text can live in a response, in the order they're tried
+_ASSISTANT_TEXT_PATHS = (
+    ("choices", 0, "message", "content"),  # chat completions (GreenPT)
+    ("choices", 0, "delta", "content"),  # streaming chunks
+    ("choices", 0, "text"),  # older completions
+    ("text",),
+    ("response",),
+    ("reply",),
+)
+
+
 def _extract_assistant_text(resp: Any) -> str:
     """Robustly extract assistant text from common model response shapes.
 
@@ -94,44 +390,67 @@ def _extract_assistant_text(resp: Any) -> str:
     if not resp:
         return ""
 
-    # If dict-like response (common)
-    if isinstance(resp, dict):
-        choices = resp.get("choices") or []
-        if choices and isinstance(choices, list):
-            first = choices[0]
-            if isinstance(first, dict):
-                # new-style chat: message.content
-                msg = first.get("message")
-                if isinstance(msg, dict):
-                    content = msg.get("content")
-                    if content:
-                        return content
-
-                # streaming delta: delta.content
-                delta = first.get("delta")
-                if isinstance(delta, dict):
-                    content = delta.get("content")
-                    if content:
-                        return content
-
-                # older completions: text
-                text = first.get("text")
-                if text:
-                    return text
-
-        # fallback top-level
-        for key in ("text", "response", "reply"):
-            v = resp.get(key)
-            if v:
-                return v
-
     # If it's already a string, return as-is
     if isinstance(resp, str):
         return resp
 
+    for path in _ASSISTANT_TEXT_PATHS:
+        value = resp
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, IndexError, TypeError):
+            continue
+        if value:
+            return value
+
     return ""
 
 
+# All four evaluation section headers, in any order, case-insensitively. One
+# compiled pattern avoids upper-casing a copy of the whole reply first.
+_EVAL_RE = re.compile(
+    r"\A(?=[\s\S]*SCORE:)(?=[\s\S]*STRENGTHS:)(?=[\s\S]*IMPROVEMENTS:)(?=[\s\S]*SUMMARY:)",
+    re.I,
+)
+
+
+def _looks_like_eval(text: str) -> bool:
+    return _EVAL_RE.match(text or "") is not None
+
+
+@functools.lru_cache(maxsize=128)
+def _build_eval_payload(cv_text: str, job_description: str, company_info: str) -> str:
+    """Build the user message for `evaluate_cv` from already-stripped inputs.
+
+    Cached so re-evaluating the same CV/job pair reuses the assembled string.
+    """
+    return (
+        "Candidate CV:\n"
+        f"{cv_text}\n\n"
+        "Job Description:\n"
+        f"{job_description or '(not provided)'}\n\n"
+        "Company Info:\n"
+        f"{company_info or '(not provided)'}"
+    )
+
+
+# Finished evaluations keyed by a hash of the exact inputs, so re-submitting
+# the same CV and job (page refresh, restarted session) skips the model call.
+# Only touched from the event loop, so no lock is needed.
+CV_EVAL_CACHE_SIZE = 256
+_CV_EVAL_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+# Evaluations currently running, keyed like the cache
+_CV_EVAL_INFLIGHT: "Dict[str, asyncio.Task]" = {}
+
+
+def _cache_eval(key: str, result: dict) -> dict:
+    _CV_EVAL_CACHE[key] = result
+    if len(_CV_EVAL_CACHE) > CV_EVAL_CACHE_SIZE:
+        _CV_EVAL_CACHE.popitem(last=False)
+    return result
+
+
 async def evaluate_cv(
     cv_text: str,
     job_description: str,
@@ -142,7 +461,8 @@ async def evaluate_cv(
 ) -> dict:
     """Ask GreenPT to evaluate how well a CV fits a role and return the formatted reply."""
 
-    if not cv_text.strip():
+    cv_text = cv_text.strip()
+    if not cv_text:
         raise HTTPException(status_code=400, detail="CV text is required for evaluation.")
 
     system_prompt = (
@@ -152,15 +472,41 @@ async def evaluate_cv(
         "Use concise bullet points (max 3 per section) and be direct."
     )
 
-    user_payload = (
-        "Candidate CV:\n"
-        f"{cv_text.strip()}\n\n"
-        "Job Description:\n"
-        f"{(job_description or '').strip() or '(not provided)'}\n\n"
-        "Company Info:\n"
-        f"{(company_info or '').strip() or '(not provided)'}"
+    user_payload = _build_eval_payload(
+        cv_text,
+        (job_description or "").strip(),
+        (company_info or "").strip(),
     )
 
+    cache_key = hashlib.sha256(
+        f"{temperature}|{max_tokens}|{user_payload}".encode()
+    ).hexdigest()
+    cached = _CV_EVAL_CACHE.get(cache_key)
+    if cached is not None:
+        _CV_EVAL_CACHE.move_to_end(cache_key)
+        return dict(cached)
+
+    # Single-flight: identical evaluations already running (e.g. a
+    # double-submitted upload) are awaited rather than started again. The
+    # shield keeps one caller's cancellation from cancelling the others.
+    task = _CV_EVAL_INFLIGHT.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _run_cv_eval(system_prompt, user_payload, cache_key, temperature, max_tokens)
+        )
+        _CV_EVAL_INFLIGHT[cache_key] = task
+        task.add_done_callback(lambda _: _CV_EVAL_INFLIGHT.pop(cache_key, None))
+    return dict(await asyncio.shield(task))
+
+
+async def _run_cv_eval(
+    system_prompt: str,
+    user_payload: str,
+    cache_key: str,
+    temperature: float,
+    max_tokens: int,
+) -> dict:
+    """Make the evaluation call(s) for `evaluate_cv` and cache the result."""
     client = get_client()
     try:
         resp = await client.chat(
@@ -180,10 +526,6 @@ async def evaluate_cv(
         raise HTTPException(status_code=502, detail="GreenPT returned an empty evaluation.")
 
     # Validate basic structure we expect: SCORE, STRENGTHS, IMPROVEMENTS, SUMMARY
-    def _looks_like_eval(text: str) -> bool:
-        t = (text or "").upper()
-        return all(k in t for k in ("SCORE:", "STRENGTHS:", "IMPROVEMENTS:", "SUMMARY:"))
-
     if not _looks_like_eval(assistant_text):
         logging.info("Evaluation missing expected sections; attempting one-pass reformat.")
         # Ask the model to reformat the assistant output into the required sections.
@@ -206,13 +548,76 @@ async def evaluate_cv(
             reformatted = _extract_assistant_text(resp2)
             if reformatted and _looks_like_eval(reformatted):
                 logging.info("Reformatted evaluation succeeded.")
-                return {"reply": reformatted.strip()}
+                return _cache_eval(cache_key, {"reply": reformatted.strip()})
             else:
                 logging.warning("Reformat attempt failed; returning original evaluation. Raw reformat response: %s", resp2)
         except Exception as exc:
             logging.warning("Reformat attempt raised an exception: %s", exc)
 
-    return {"reply": assistant_text.strip()}
+    return _cache_eval(cache_key, {"reply": assistant_text.strip()})
+
+
+# Instruction for the session start call: use the session's system prompt but
+# explicitly ask for exactly one interview question. This avoids the model
+# returning an overall evaluation/summary at session start.
+START_INSTRUCTION = (
+    "Please ask exactly one interview question tailored to the candidate. "
+    "Do NOT provide any evaluation, summary, or feedback — ask only the question. "
+    "Keep it concise and clear."
+)
+
+
+async def _generate_opening(context: List[Dict[str, str]]) -> dict:
+    """Ask GreenPT for the first interview question given the session's system
+    prompt and assets messages (`context`); returns the raw response."""
+    messages = [*context, {"role": "user", "content": START_INSTRUCTION}]
+    return await get_client().chat(messages)
+
+
+def _prefetch_opening(session) -> None:
+    """Start generating the opening question in the background, for `/start` to pick up.
+
+    Started by `/settings`, the last step before the frontend calls `/start`, so the
+    question is generated under the final system prompt while the client moves on
+    to the interview page. In-memory sessions only: with Redis, `/start` loads a
+    fresh copy of the session that wouldn't carry the task. Failures are only
+    logged; `/start` then generates the question itself.
+    """
+    if uses_redis() or session.metadata.get("questions_asked", 0):
+        return
+    _discard_opening(session)
+    context = list(session.context_messages)
+    task = asyncio.create_task(_generate_opening(context))
+    task.add_done_callback(_log_prefetch_failure)
+    session._pending_opening = (context, task)
+
+
+def _log_prefetch_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning("Opening question prefetch failed: %s", task.exception())
+
+
+def _discard_opening(session) -> None:
+    if session._pending_opening is not None:
+        session._pending_opening[1].cancel()
+        session._pending_opening = None
+
+
+async def _take_opening(session) -> Optional[dict]:
+    """The prefetched opening response, if it was generated under the session's
+    current system prompt and assets and succeeded; None otherwise."""
+    pending = session._pending_opening
+    session._pending_opening = None
+    if pending is None:
+        return None
+    context, task = pending
+    if context != session.context_messages:
+        task.cancel()
+        return None
+    try:
+        return await task
+    except Exception:  # logged by _log_prefetch_failure
+        return None
 
 
 # ---------- endpoint to turn CV file into text (still available if needed) ----------
@@ -223,9 +628,9 @@ async def extract_cv_text(cv: UploadFile = File(...)):
 
     Frontend will send FormData with field name 'cv'.
     """
+    _check_cv_upload(cv)
     try:
-        data = await cv.read()
-        text = extract_text_from_cv_file(cv.filename, data)
+        text = await _extract_cv_text(cv)
     except HTTPException:
         # propagate our HTTPExceptions (unsupported type, etc.)
         raise
@@ -254,9 +659,9 @@ async def create_session_from_upload(
     - Return { id, cv_eval }
     """
     # 1) Extract text from the uploaded CV
+    _check_cv_upload(cv)
     try:
-        data = await cv.read()
-        cv_text = extract_text_from_cv_file(cv.filename, data)
+        cv_text = await _extract_cv_text(cv, max_chars=MAX_CV_CHARS)
     except HTTPException:
         # Propagate known HTTP errors as-is (e.g. unsupported file types)
         raise
@@ -266,86 +671,92 @@ async def create_session_from_upload(
     # 2) Build base system prompt (use default prompt if frontend didn't set presets)
     base = DEFAULT_PROMPT
 
-    # 3) Create a new session
-    session = create_session(system_prompt=base, metadata={})
-
-    # initialize question counters and limits
-    session.metadata.setdefault("questions_asked", 0)
-    session.metadata.setdefault("max_questions", int(max_questions or 10))
+    # 3) Create a new session, initializing question counters and limits
+    session = await create_session(
+        system_prompt=base,
+        metadata={"questions_asked": 0, "max_questions": int(max_questions or 10)},
+    )
 
     # 4) Attach assets (CV text + job description + company info)
-    set_assets(
-        session.id,
+    await set_assets(
+        session,
         cv=cv_text,
         job_description=job_description,
         company_info=company_info,
         base_prompt=base,
     )
 
-    # 5) Evaluate CV with GreenPT
+    # 5) Evaluate CV with GreenPT (the session holds the stripped assets, so
+    #    evaluate_cv doesn't copy them again). The opening question isn't
+    #    generated here: the frontend applies settings before /start, which
+    #    changes the system prompt, so /settings starts it instead.
     cv_eval = await evaluate_cv(
         cv_text=cv_text,
-        job_description=job_description,
-        company_info=company_info,
+        job_description=session.job_description or "",
+        company_info=session.company_info or "",
     )
 
-    # 5) Return session info
+    # 6) Return session info
     return {"id": session.id, "cv_eval": cv_eval}
 
 @app.get("/session/{session_id}")
 async def get_session_endpoint(session_id: str):
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="session not found")
-    return session.dict()
+    # Returned as a response directly so FastAPI skips its jsonable_encoder pass
+    # over the message history; orjson serializes the Message dataclasses natively
+    return ORJSONResponse(session.model_dump())
 
 @app.post("/session/{session_id}/start")
-async def start_session(session_id: str):
+async def start_session(session_id: str, stream: bool = False):
     """Trigger the model to produce the first assistant question for a session.
 
     This calls the model with the current system prompt (and any messages),
     appends the assistant reply to the session, and increments the question counter.
+    With `?stream=true` the question is sent as server-sent events, like `/message`.
     """
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="session not found")
-
-    q = session.metadata.get("questions_asked", 0)
-    max_q = session.metadata.get("max_questions", 10)
-    if q >= max_q:
-        raise HTTPException(status_code=400, detail="Question limit reached")
-
-    # Build a focused message set for the session start call: use the session's
-    # system prompt but explicitly instruct the model to ask exactly one
-    # interview question. This avoids the model returning an overall
-    # evaluation/summary at session start.
-    start_instruction = (
-        "Please ask exactly one interview question tailored to the candidate. "
-        "Do NOT provide any evaluation, summary, or feedback — ask only the question. "
-        "Keep it concise and clear."
-    )
-
-    messages = [
-        {"role": "system", "content": session.system_prompt},
-        {"role": "user", "content": start_instruction},
-    ]
-
-    client = get_client()
-    try:
-        resp = await client.chat(messages)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    assistant_text = _extract_assistant_text(resp)
-    if not assistant_text:
-        logging.warning("No assistant text found for session start; raw response: %s", resp)
-        assistant_text = "(no text returned from model)"
-
-    # append assistant reply and increment counter
-    append_message(session_id, role="assistant", content=assistant_text)
-    session.metadata["questions_asked"] = q + 1
-
-    return {"reply": assistant_text, "raw": resp}
+    async with session_lock(session_id):
+        session = await get_session(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="session not found")
+
+        q = session.metadata.get("questions_asked", 0)
+        max_q = session.metadata.get("max_questions", 10)
+        if q >= max_q:
+            raise HTTPException(status_code=400, detail="Question limit reached")
+
+        resp = await _take_opening(session)
+        if resp is None and stream:
+            # generated under the lock inside _stream_reply, which refuses if a
+            # concurrent /start asked the opening question in the meantime
+            return StreamingResponse(
+                _stream_reply(session_id, None, {}, expected_questions=q),
+                media_type="text/event-stream",
+            )
+        if resp is None:
+            try:
+                resp = await _generate_opening(session.context_messages)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+        assistant_text = _extract_assistant_text(resp)
+        if not assistant_text:
+            logging.warning("No assistant text found for session start; raw response: %s", resp)
+            assistant_text = "(no text returned from model)"
+
+        # append assistant reply and increment counter
+        await append_message(session, role="assistant", content=assistant_text)
+        session.metadata["questions_asked"] = q + 1
+        await save_session(session)
+
+        if stream:
+            # already generated ahead of /start: send it as a single final event
+            return StreamingResponse(
+                iter([_sse_event({"reply": assistant_text})]),
+                media_type="text/event-stream",
+            )
+        return {"reply": assistant_text, "raw": resp}
 
 @app.post("/session/{session_id}/settings")
 async def apply_session_settings(session_id: str, req: SettingsReq):
@@ -353,7 +764,7 @@ async def apply_session_settings(session_id: str, req: SettingsReq):
 
     Expects JSON body with fields: technicality (1-3), politeness (1-3), difficulty (1-3).
     """
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="session not found")
 
@@ -362,7 +773,8 @@ async def apply_session_settings(session_id: str, req: SettingsReq):
     if not prompt:
         raise HTTPException(status_code=400, detail="No prompt available for given settings")
 
-    updated = set_system_prompt(session_id, prompt)
+    updated = await set_system_prompt(session, prompt)
+    _prefetch_opening(updated)
     return {"id": updated.id, "system_prompt": updated.system_prompt}
 
 
@@ -372,6 +784,8 @@ async def post_message(
     request: Request,
     audio: Optional[UploadFile] = File(None),
     question_index: Optional[int] = Form(None),
+    stream: bool = False,
+    debug: bool = False,
 ):
     """Accept either JSON with `{content: string}` or multipart `audio` upload.
 
@@ -379,91 +793,182 @@ async def post_message(
       as the user's message (useful for summary prompts from the frontend).
     - Otherwise, if an `audio` file is provided, run server-side transcription and
       use the transcript as the user's message.
+    - With `?stream=true` the reply is sent as server-sent events as it is generated.
+    - The raw GreenPT response is only included with `?debug=true`.
     """
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="session not found")
+    # Requests for the same session are handled one at a time so the history
+    # and question counter are never updated from two requests at once
+    async with session_lock(session_id):
+        session = await get_session(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="session not found")
+
+        # enforce question limit first, so an exhausted session is rejected before
+        # any transcription, session write or model call
+        q = session.metadata.get("questions_asked", 0)
+        max_q = session.metadata.get("max_questions", 10)
+        if q >= max_q:
+            raise HTTPException(status_code=400, detail="Question limit reached")
+
+        # Determine whether this is a JSON request or a form/audio request
+        content_type = request.headers.get("content-type", "")
+        is_json = content_type.startswith("application/json")
+
+        transcribed_text = ""
+
+        if is_json:
+            # Read JSON body and extract `content`
+            try:
+                body = await request.json()
+            except Exception:
+                raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+            if not isinstance(body, dict) or "content" not in body:
+                raise HTTPException(status_code=422, detail="JSON body must contain 'content' field")
+
+            transcribed_text = str(body.get("content") or "").strip()
+            if not transcribed_text:
+                raise HTTPException(status_code=400, detail="Empty 'content' in JSON body")
+
+        else:
+            # Expect an audio file in multipart/form-data
+            if audio is None:
+                raise HTTPException(status_code=400, detail="No audio file provided")
+
+            try:
+                audio_content = await audio.read()
+                transcribed_text = await speech_to_text_async(
+                    audio_content, content_type=audio.content_type or "audio/wav"
+                )
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Speech-to-text failed: {str(e)}")
+
+        # the lock is released when the response is returned; _stream_reply
+        # takes it again for the whole stream
+        if stream:
+            return StreamingResponse(
+                _stream_reply(
+                    session_id,
+                    transcribed_text,
+                    {"question_index": question_index, "transcribed_text": transcribed_text},
+                ),
+                media_type="text/event-stream",
+            )
+
+        # append user message
+        await append_message(session, role="user", content=transcribed_text)
 
-    # Determine whether this is a JSON request or a form/audio request
-    content_type = request.headers.get("content-type", "")
-    is_json = content_type.startswith("application/json")
+        # prepare messages for GreenPT: include system and history, with the
+        # oldest turns dropped once the conversation gets long
+        await prune_history(session)
+        messages = session.chat_messages
 
-    transcribed_text = ""
+        client = get_client()
 
-    if is_json:
-        # Read JSON body and extract `content`
         try:
-            body = await request.json()
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid JSON body")
+            resp = await client.chat(messages)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
-        if not isinstance(body, dict) or "content" not in body:
-            raise HTTPException(status_code=422, detail="JSON body must contain 'content' field")
+        assistant_text = _extract_assistant_text(resp)
+        if not assistant_text:
+            logging.warning("No assistant text found for message reply; raw response: %s", resp)
+            assistant_text = "(no text returned from model)"
 
-        transcribed_text = str(body.get("content") or "").strip()
-        if not transcribed_text:
-            raise HTTPException(status_code=400, detail="Empty 'content' in JSON body")
+        # append assistant reply to session and increment question counter
+        await append_message(session, role="assistant", content=assistant_text)
+        session.metadata["questions_asked"] = q + 1
+        await save_session(session)
 
-    else:
-        # Expect an audio file in multipart/form-data
-        if audio is None:
-            raise HTTPException(status_code=400, detail="No audio file provided")
+        result = {
+            "reply": assistant_text, 
+            "question_index": question_index,
+            "transcribed_text": transcribed_text
+        }
+        if debug:
+            result["raw"] = resp
+        return result
+
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(data) + b"\n\n"
 
+
+async def _stream_reply(
+    session_id: str,
+    user_text: Optional[str],
+    extra: Dict[str, Any],
+    expected_questions: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """Relay GreenPT's reply to `user_text` as server-sent events while it is generated.
+
+    With `user_text` None the reply is the opening question for `/start`.
+    Emits `{"delta": ...}` per text chunk and a final `{"reply": ..., **extra}`
+    event. The user message and the full reply are appended to the session
+    together at the end, so a failed stream leaves the history untouched.
+
+    The endpoint's session lock is released once it returns the response, so
+    the lock is taken again here and held until the reply is saved; the
+    session is re-read and the question limit re-checked under it. With
+    `expected_questions`, the reply is also refused if the question counter
+    has moved on from that value (another request got there first).
+    """
+    async with session_lock(session_id):
+        session = await get_session(session_id)
+        if not session:
+            yield _sse_event({"detail": "session not found"}, event="error")
+            return
+        q = session.metadata.get("questions_asked", 0)
+        if q >= session.metadata.get("max_questions", 10):
+            yield _sse_event({"detail": "Question limit reached"}, event="error")
+            return
+        if expected_questions is not None and q != expected_questions:
+            yield _sse_event({"detail": "Session already started"}, event="error")
+            return
+
+        if user_text is None:
+            messages = [*session.context_messages, {"role": "user", "content": START_INSTRUCTION}]
+            entries = []
+        else:
+            await prune_history(session)
+            messages = [*session.chat_messages, {"role": "user", "content": user_text}]
+            entries = [("user", user_text)]
+
+        parts: List[str] = []
         try:
-            audio_content = await audio.read()
-            from interview_helper.speech_to_text import speech_to_text2
-            transcribed_text = speech_to_text2(audio_content)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Speech-to-text failed: {str(e)}")
-
-    # append user message
-    append_message(session_id, role="user", content=transcribed_text)
-    
-
-    # enforce question limit before generating a new assistant reply
-    q = session.metadata.get("questions_asked", 0)
-    max_q = session.metadata.get("max_questions", 10)
-    if q >= max_q:
-        raise HTTPException(status_code=400, detail="Question limit reached")
-    
-    # prepare messages for GreenPT: include system and history
-    messages = [m.dict() for m in session.messages]
-    client = get_client()
-    
-    try:
-        resp = await client.chat(messages)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    # try to extract assistant content (compatible with common chat APIs)
-    assistant_text = ""
-    if isinstance(resp, dict):
-        choices = resp.get("choices") or []
-        if choices:
-            first = choices[0]
-            if isinstance(first, dict) and "message" in first and isinstance(first["message"], dict):
-                assistant_text = first["message"].get("content", "")
-            else:
-                assistant_text = first.get("text", "")
-    if not assistant_text and isinstance(resp, dict):
-        assistant_text = resp.get("text", "") or resp.get("response", "")
-    if not assistant_text:
-        logging.warning("No assistant text found for message reply; raw response: %s", resp)
-        assistant_text = "(no text returned from model)"
-    
-    # append assistant reply to session and increment question counter
-    append_message(session_id, role="assistant", content=assistant_text)
-    session.metadata["questions_asked"] = q + 1
-    
-    return {
-        "reply": assistant_text, 
-        "raw": resp,
-        "question_index": question_index,
-        "transcribed_text": transcribed_text
-    }
+            async for chunk in get_client().chat_stream(messages):
+                delta = _extract_assistant_text(chunk)
+                if delta:
+                    parts.append(delta)
+                    yield _sse_event({"delta": delta})
+        except Exception as exc:
+            logging.warning("Streaming reply failed: %s", exc)
+            yield _sse_event({"detail": str(exc)}, event="error")
+            return
+
+        assistant_text = "".join(parts)
+        if not assistant_text:
+            logging.warning("No assistant text found in streamed reply for session %s", session_id)
+            assistant_text = "(no text returned from model)"
+
+        await append_messages(session, [*entries, ("assistant", assistant_text)])
+        session.metadata["questions_asked"] = q + 1
+        await save_session(session)
+
+    yield _sse_event({"reply": assistant_text, **extra})
+
 
 if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", "8000"))
-    uvicorn.run("backend.src.main:app", host="0.0.0.0", port=port, reload=True)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # uvicorn picks uvloop/httptools on its own when installed (uvicorn[standard]);
+    # reload only supports one worker
+    uvicorn.run(
+        "backend.src.main:app",
+        host="0.0.0.0",
+        port=port,
+        reload=workers == 1,
+        workers=workers,
+    )
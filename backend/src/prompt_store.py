@@ -47,21 +47,36 @@ def _normalize(level: int) -> int:
     return max(1, min(3, value))
 
 
+# The three style notes sit on consecutive lines of BASE_PROMPT, so the template
+# is split around them once and prompts are assembled by concatenation.
+_NOTES_PLACEHOLDER = "{technicality_note}\n{politeness_note}\n{difficulty_note}"
+_PROMPT_PREFIX, _, _PROMPT_SUFFIX = BASE_PROMPT.partition(_NOTES_PLACEHOLDER)
+
+
 def _build_prompt(technicality: int = 2, politeness: int = 2, difficulty: int = 2) -> str:
     t_note = TECHNICALITY_NOTES[_normalize(technicality)]
     p_note = POLITENESS_NOTES[_normalize(politeness)]
     d_note = DIFFICULTY_NOTES[_normalize(difficulty)]
-    return BASE_PROMPT.format(
-        technicality_note=t_note,
-        politeness_note=p_note,
-        difficulty_note=d_note,
-    )
+    if not _PROMPT_SUFFIX:
+        # template no longer has the notes block in one piece; format it normally
+        return BASE_PROMPT.format(
+            technicality_note=t_note,
+            politeness_note=p_note,
+            difficulty_note=d_note,
+        )
+    return "".join((_PROMPT_PREFIX, t_note, "\n", p_note, "\n", d_note, _PROMPT_SUFFIX))
 
 
 DEFAULT_PROMPT = _build_prompt(2, 2, 2)
 
 
-@lru_cache(maxsize=None)
-def get_prompt(technicality: int, politeness: int, difficulty: int) -> str:
+# Levels are clamped to 1-3 before the lookup, so there are exactly 3*3*3
+# distinct prompts; out-of-range requests can't grow the cache.
+@lru_cache(maxsize=27)
+def _cached_prompt(technicality: int, politeness: int, difficulty: int) -> str:
     return _build_prompt(technicality, politeness, difficulty)
+
+
+def get_prompt(technicality: int, politeness: int, difficulty: int) -> str:
+    return _cached_prompt(_normalize(technicality), _normalize(politeness), _normalize(difficulty))
     
\ No newline at end of file
@@ -1,12 +1,27 @@
+import asyncio
+import os
+import secrets
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from uuid import uuid4
+from pydantic import BaseModel, PrivateAttr
 
+import orjson
+from cachetools import TTLCache
 
-class Message(BaseModel):
+
+# A plain slotted dataclass rather than a model: messages are appended on every
+# turn and need no validation beyond what the API edge already did. Needs
+# pydantic v2 as a `Session` field; v1 can't validate slotted dataclasses.
+@dataclass(slots=True)
+class Message:
     role: str
     content: str
 
+    def as_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
 
 class Session(BaseModel):
     id: str
@@ -19,120 +34,344 @@ class Session(BaseModel):
     job_description: str | None = None
     company_info: str | None = None
 
+    # The assets rendered for the model. Sent as their own message right after
+    # the system prompt, so the system prompt itself stays static (and
+    # cacheable) across asset and settings changes.
+    assets_prompt: str | None = None
+
+    # Opening question being generated ahead of `/start`, as (context messages,
+    # task resolving to the raw response). Private so it stays out of `session.model_dump()`.
+    _pending_opening: tuple[List[Dict[str, str]], "asyncio.Task[Dict[str, Any]]"] | None = PrivateAttr(default=None)
+
+    # `messages` as plain dicts, maintained alongside it so each chat call
+    # doesn't re-serialize the whole history
+    _messages_dicts: List[Dict[str, str]] = PrivateAttr(default_factory=list)
+
+    # Rough token count (chars / 4) of the conversation after the context
+    # messages, kept up to date on every append
+    _tokens_estimate: int = PrivateAttr(default=0)
+
+    @property
+    def chat_messages(self) -> List[Dict[str, str]]:
+        """Message history in the shape the chat API expects."""
+        return self._messages_dicts
+
+    @property
+    def context_messages(self) -> List[Dict[str, str]]:
+        """The leading system prompt and assets messages, without the conversation."""
+        return self._messages_dicts[: 2 if self.assets_prompt else 1]
+
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+MAX_SESSIONS = 10_000
+
+# Conversation size (estimated tokens) past which the oldest turns are dropped
+MAX_HISTORY_TOKENS = int(os.getenv("MAX_HISTORY_TOKENS", "6000"))
+
+# Sessions live in this process by default. When REDIS_URL is configured they
+# are stored in Redis instead (so any worker can serve any session), rebuilt
+# on every `get_session()`, and this cache is unused. Idle sessions expire
+# after SESSION_TTL_SECONDS either way, so memory stays bounded.
+_SESSIONS: "TTLCache[str, Session]" = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS)
+
+# One lock per session currently in use. Weak values: a lock disappears once
+# no request holds or waits on it, so nothing has to evict it.
+_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    """Lock serializing read-modify-write request handling for one session.
+
+    Requests for other sessions are never blocked. With REDIS_URL set this only
+    serializes requests within one worker.
+    """
+    lock = _LOCKS.get(session_id)
+    if lock is None:
+        lock = _LOCKS[session_id] = asyncio.Lock()
+    return lock
+
+_redis = None
+
+
+def uses_redis() -> bool:
+    """Whether sessions are kept in Redis, i.e. `get_session()` returns a fresh copy each call."""
+    return _redis is not None
 
-_SESSIONS: Dict[str, Session] = {}
 
+async def init_store(url: str | None = None) -> None:
+    """Connect to Redis when `url` (or REDIS_URL) is set; otherwise keep sessions in memory."""
+    global _redis
+    url = url or os.getenv("REDIS_URL")
+    if url:
+        import redis.asyncio as redis
+
+        _redis = redis.from_url(url)
+
+
+async def close_store() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+# Redis layout: the session minus its messages as one JSON blob, and the
+# messages as a list so appends don't rewrite the whole session.
+def _state_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def _messages_key(session_id: str) -> str:
+    return f"session:{session_id}:msgs"
+
+
+# instruction header sent with the assets: explicitly tell the model to prioritize the job description
+ASSETS_INSTRUCTION = (
+    "Important: When selecting, ordering, and framing interview questions, prioritize the Job Description as the primary source. "
+    "Use the Candidate CV to ground questions in the candidate's background and experience, and use Company Info to align tone and context. "
+    "Make sure questions are relevant to the job description and avoid asking unrelated details."
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+@lru_cache(maxsize=128)
+def _render_assets(cv: str, job_description: str, company_info: str) -> str | None:
+    """Build the assets message text from stripped assets (None when there are none).
+
+    Cached: the same CV/job pair (a retried upload, a re-run sample) is
+    rendered once and every session shares the resulting string.
+    """
+    # small helper to avoid sending extremely long assets in full
+    def _truncate(text: str, max_chars: int = 4000) -> str:
+        if len(text) <= max_chars:
+            return text
+        return text[: max_chars - 12].rstrip() + "\n\n[TRUNCATED]"
+
+    # assemble the assets message: instruction header, then assets sections
+    parts = []
+    if cv:
+        parts.append("---\nCandidate CV:\n" + _truncate(cv))
+    if job_description:
+        parts.append("---\nJob Description:\n" + _truncate(job_description))
+    if company_info:
+        parts.append("---\nCompany Info:\n" + _truncate(company_info))
 
-def create_session(system_prompt: str, metadata: Dict[str, Any] | None = None) -> Session:
-    sid = str(uuid4())
-    session = Session(id=sid, system_prompt=system_prompt, messages=[Message(role="system", content=system_prompt)], metadata=metadata or {})
-    _SESSIONS[sid] = session
+    # join with spacing between sections
+    return "\n\n".join([ASSETS_INSTRUCTION, *parts]) if parts else None
+
+
+def _dump_state(session: Session) -> bytes:
+    return orjson.dumps(session.model_dump(exclude={"messages"}))
+
+
+async def save_session(session: Session) -> None:
+    """Persist changes made directly to a session's fields (e.g. `metadata`)."""
+    if _redis is None:
+        return
+    await _redis.set(_state_key(session.id), _dump_state(session), ex=SESSION_TTL_SECONDS)
+
+
+async def create_session(system_prompt: str, metadata: Dict[str, Any] | None = None) -> Session:
+    # Short opaque token: cheaper than formatting a UUID4, still unguessable
+    # and unique across workers sharing Redis
+    sid = secrets.token_urlsafe(9)
+    system_message = Message(role="system", content=system_prompt)
+    session = Session(id=sid, system_prompt=system_prompt, messages=[system_message], metadata=metadata or {})
+    session._messages_dicts = [system_message.as_dict()]
+
+    if _redis is None:
+        _SESSIONS[sid] = session
+    else:
+        async with _redis.pipeline(transaction=True) as pipe:
+            pipe.set(_state_key(sid), _dump_state(session), ex=SESSION_TTL_SECONDS)
+            pipe.rpush(_messages_key(sid), orjson.dumps(session._messages_dicts[0]))
+            pipe.expire(_messages_key(sid), SESSION_TTL_SECONDS)
+            await pipe.execute()
     return session
 
 
-def get_session(session_id: str) -> Session | None:
-    return _SESSIONS.get(session_id)
+async def get_session(session_id: str) -> Session | None:
+    if _redis is None:
+        session = _SESSIONS.get(session_id)
+        if session is not None:
+            # re-insert to restart the idle timer while the session is in use
+            _SESSIONS[session_id] = session
+        return session
 
+    async with _redis.pipeline(transaction=False) as pipe:
+        pipe.get(_state_key(session_id))
+        pipe.lrange(_messages_key(session_id), 0, -1)
+        state, raw_messages = await pipe.execute()
+    if state is None:
+        return None
+
+    dicts = [orjson.loads(m) for m in raw_messages]
+    session = Session(**orjson.loads(state), messages=[Message(**d) for d in dicts])
+    session._messages_dicts = dicts
+    session._tokens_estimate = sum(
+        _estimate_tokens(d["content"]) for d in dicts[len(session.context_messages):]
+    )
+    return session
+
+
+async def append_message(session: Session, role: str, content: str) -> Message:
+    return (await append_messages(session, [(role, content)]))[0]
+
+
+async def append_messages(session: Session, entries: List[tuple[str, str]]) -> List[Message]:
+    """Append several `(role, content)` messages with one store write.
+
+    Used for a user answer together with the reply to it, which saves a Redis
+    round-trip per turn compared to two `append_message` calls.
+    """
+    msgs = [Message(role=role, content=content) for role, content in entries]
+    if not msgs:
+        return msgs
+    dicts = [msg.as_dict() for msg in msgs]
+    session.messages.extend(msgs)
+    session._messages_dicts.extend(dicts)
+    session._tokens_estimate += sum(_estimate_tokens(msg.content) for msg in msgs)
 
-def append_message(session_id: str, role: str, content: str) -> Message:
-    session = _SESSIONS[session_id]
-    msg = Message(role=role, content=content)
-    session.messages.append(msg)
-    return msg
+    if _redis is not None:
+        async with _redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(_messages_key(session.id), *(orjson.dumps(d) for d in dicts))
+            pipe.expire(_messages_key(session.id), SESSION_TTL_SECONDS)
+            pipe.expire(_state_key(session.id), SESSION_TTL_SECONDS)
+            await pipe.execute()
+    return msgs
 
 
-def set_assets(
-    session_id: str,
+async def set_assets(
+    session: Session,
     cv: Optional[str] = None,
     job_description: Optional[str] = None,
     company_info: Optional[str] = None,
     base_prompt: Optional[str] = None,
-) -> Session:
-    """Attach textual assets to a session and update its system prompt.
+) -> None:
+    """Attach textual assets to a session, updating it in place.
 
     Responsibilities:
     - store raw assets on the session (`cv`, `job_description`, `company_info`)
-    - rebuild the session.system_prompt to include the assets under clear headings
-      using `base_prompt` when provided; otherwise try to recover a sensible base
-      by stripping any previously embedded asset sections.
+    - render them under clear headings into `session.assets_prompt`, which is
+      kept as its own system message directly after the system prompt
+    - when `base_prompt` is provided, make it the session's system prompt
 
-    This also replaces the first system message so the chat history has the
-    correct system message the model will consume.
+    The assets are deliberately not interpolated into the system prompt: that
+    way the system prompt stays identical for every session using the same
+    settings, and later settings changes don't disturb the assets.
     """
-    session = _SESSIONS[session_id]
-
-    # store incoming assets (allow partial updates)
+    # store incoming assets (allow partial updates), stripped once here so the
+    # stored form is canonical and never needs stripping again
     if cv is not None:
-        session.cv = cv
+        session.cv = cv.strip()
     if job_description is not None:
-        session.job_description = job_description
+        session.job_description = job_description.strip()
     if company_info is not None:
-        session.company_info = company_info
+        session.company_info = company_info.strip()
 
-    # determine a clean base prompt to avoid double-including assets
     if base_prompt:
-        base = base_prompt.strip()
-    else:
-        # try to strip previously appended assets from the stored prompt
-        raw = session.system_prompt or ""
-        separator = "\n\n---\nCandidate CV:"
-        idx = raw.find(separator)
-        if idx != -1:
-            base = raw[:idx].strip()
-        else:
-            base = raw.strip()
+        session.system_prompt = base_prompt.strip()
 
-    # small helper to avoid sending extremely long assets in full
-    def _truncate(text: str, max_chars: int = 4000) -> str:
-        if not text:
-            return ""
-        t = text.strip()
-        if len(t) <= max_chars:
-            return t
-        return t[: max_chars - 12].rstrip() + "\n\n[TRUNCATED]"
-
-    # instruction header: explicitly tell the model to prioritize the job description
-    instruction_header = (
-        "Important: When selecting, ordering, and framing interview questions, prioritize the Job Description as the primary source. "
-        "Use the Candidate CV to ground questions in the candidate's background and experience, and use Company Info to align tone and context. "
-        "Make sure questions are relevant to the job description and avoid asking unrelated details."
+    had_assets = bool(session.assets_prompt)
+    session.assets_prompt = _render_assets(
+        session.cv or "", session.job_description or "", session.company_info or ""
     )
 
-    # assemble the final prompt: instruction header, base prompt, then assets sections
-    parts = [instruction_header]
-    if base:
-        parts.append(base)
+    if not session.messages:
+        await _save_system_prompt(session)
+    elif bool(session.assets_prompt) != had_assets:
+        # the assets message was added or removed: the history shifts by one
+        if session.assets_prompt:
+            msg = Message(role="system", content=session.assets_prompt)
+            session.messages.insert(1, msg)
+            session._messages_dicts.insert(1, msg.as_dict())
+        else:
+            del session.messages[1]
+            del session._messages_dicts[1]
+        _replace_system_message(session)
+        await _save_all_messages(session)
+    else:
+        _replace_system_message(session)
+        await _save_system_prompt(session)
 
-    if session.cv:
-        parts.append("---\nCandidate CV:\n" + _truncate(session.cv))
-    if session.job_description:
-        parts.append("---\nJob Description:\n" + _truncate(session.job_description))
-    if session.company_info:
-        parts.append("---\nCompany Info:\n" + _truncate(session.company_info))
 
-    # join with spacing between sections
-    final_prompt = "\n\n".join(parts)
-    if final_prompt:
-        session.system_prompt = final_prompt
-        # update the first system message so chat history is consistent
-        if session.messages:
-            session.messages[0] = Message(role="system", content=session.system_prompt)
+def _replace_system_message(session: Session) -> None:
+    """Point the leading system (and assets) messages at the session's current prompts."""
+    msg = Message(role="system", content=session.system_prompt)
+    session.messages[0] = msg
+    session._messages_dicts[0] = msg.as_dict()
+    if session.assets_prompt and len(session.messages) > 1:
+        msg = Message(role="system", content=session.assets_prompt)
+        session.messages[1] = msg
+        session._messages_dicts[1] = msg.as_dict()
 
-    return session
+
+async def _save_system_prompt(session: Session) -> None:
+    """Persist the session state together with its rewritten leading messages."""
+    if _redis is None:
+        return
+    async with _redis.pipeline(transaction=True) as pipe:
+        pipe.set(_state_key(session.id), _dump_state(session), ex=SESSION_TTL_SECONDS)
+        for i, msg in enumerate(session.context_messages):
+            pipe.lset(_messages_key(session.id), i, orjson.dumps(msg))
+        await pipe.execute()
+
+
+async def _save_all_messages(session: Session) -> None:
+    """Persist the session state and rewrite its whole message list."""
+    if _redis is None:
+        return
+    key = _messages_key(session.id)
+    async with _redis.pipeline(transaction=True) as pipe:
+        pipe.set(_state_key(session.id), _dump_state(session), ex=SESSION_TTL_SECONDS)
+        pipe.delete(key)
+        pipe.rpush(key, *(orjson.dumps(m) for m in session._messages_dicts))
+        pipe.expire(key, SESSION_TTL_SECONDS)
+        await pipe.execute()
+
+
+async def prune_history(session: Session, max_tokens: int = MAX_HISTORY_TOKENS) -> int:
+    """Drop the oldest conversation turns once the history grows past `max_tokens`.
+
+    The system prompt and assets messages are always kept, as is the latest
+    message. Pruning goes down to three quarters of the limit, so the
+    history (and the Redis list, which is rewritten) changes every few turns
+    rather than on every one. Returns the number of messages dropped.
+    """
+    if session._tokens_estimate <= max_tokens:
+        return 0
+
+    start = len(session.context_messages)
+    end = start
+    tokens = session._tokens_estimate
+    target = max_tokens * 3 // 4
+    while tokens > target and end < len(session.messages) - 1:
+        tokens -= _estimate_tokens(session.messages[end].content)
+        end += 1
+
+    del session.messages[start:end]
+    del session._messages_dicts[start:end]
+    session._tokens_estimate = tokens
+    await _save_all_messages(session)
+    return end - start
 
 
 def list_sessions() -> List[Session]:
+    """Sessions held in this process (none when REDIS_URL is configured)."""
     return list(_SESSIONS.values())
 
 
-def set_system_prompt(session_id: str, system_prompt: str) -> Session:
+async def set_system_prompt(session: Session, system_prompt: str) -> Session:
     """Set the session system prompt and update the first system message.
 
     Use this when you want to directly apply a prepared system prompt to an
     existing session (for example, one selected from a prompts store).
     """
-    session = _SESSIONS[session_id]
     session.system_prompt = system_prompt
     if session.messages:
-        session.messages[0] = Message(role="system", content=session.system_prompt)
+        _replace_system_message(session)
+    await _save_system_prompt(session)
     return session
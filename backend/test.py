@@ -9,85 +9,45 @@ Run it to:
 from __future__ import annotations
 
 import asyncio
+import io
 import os
-from textwrap import dedent
+from functools import lru_cache
+from pathlib import Path
 
+import orjson
 from fastapi import HTTPException
 
+try:
+    from prompt_toolkit import PromptSession
+except ImportError:  # optional; plain input() on a worker thread otherwise
+    PromptSession = None
+
 from backend.src import prompt_store
 from backend.src.main import evaluate_cv
 from backend.src.prompt_store import get_prompt
-from backend.src.sessions import create_session, set_assets, append_message
-from backend.src.greenpt import get_client
-
-SAMPLES = (
-    {
-        "name": "Senior Backend Engineer",
-        "cv_text": dedent(
-            """
-            Jane Doe
-            Email: jane@example.com | GitHub: github.com/janedoe | 8 years experience
-
-            Experience:
-            - Lead Backend Engineer at CloudScale (2021-2024)
-              Designed event-driven microservices on AWS using Python, FastAPI, and PostgreSQL.
-              Reduced API latency by 38% and rolled out observability via OpenTelemetry.
-            - Backend Engineer at DataForge (2017-2021)
-              Built ETL pipelines in Python and Spark, maintained CI/CD with GitHub Actions.
-
-            Skills: Python, FastAPI, PostgreSQL, Docker, AWS, Redis, Terraform
-            Education: BSc Computer Science, MIT
-            """
-        ).strip(),
-        "job_description": dedent(
-            """
-            We are hiring a Senior Backend Engineer to lead API development for our analytics platform.
-            Must be fluent in Python, FastAPI, relational databases, and cloud infrastructure.
-            Bonus points for experience with observability tooling and CI/CD automation.
-            """
-        ).strip(),
-        "company_info": dedent(
-            """
-            Nimbus Analytics builds data insights tooling for enterprise finance teams.
-            We value pragmatic engineering, strong documentation habits, and customer empathy.
-            """
-        ).strip(),
-    },
-    {
-        "name": "Junior Frontend Developer",
-        "cv_text": dedent(
-            """
-            John Smith
-            john.smith@email.com | Portfolio: johnsmith.dev | 2 years experience
-
-            Experience:
-            - Frontend Developer at PixelWorks (2023-Present)
-              Maintained React components, collaborated with designers, and improved Lighthouse scores by 20%.
-            - Frontend Intern at WebNest (2022)
-              Built UI prototypes, wrote Cypress tests, and contributed to component documentation.
-
-            Skills: JavaScript, TypeScript, React, Next.js, Tailwind, Cypress
-            Education: BA Interactive Media, UCLA
-            """
-        ).strip(),
-        "job_description": dedent(
-            """
-            Looking for a Junior Frontend Developer comfortable with React and Next.js to ship polished user interfaces.
-            Familiarity with automated testing (Cypress) and design systems is preferred.
-            """
-        ).strip(),
-        "company_info": dedent(
-            """
-            BrightLeaf is a seed-stage startup helping small retailers run data-driven marketing campaigns.
-            Team works remotely across US time zones and iterates quickly based on user feedback.
-            """
-        ).strip(),
-    },
-)
-
-
-async def run_sample(sample: dict[str, str]) -> None:
-    print(f"\n=== {sample['name']} ===")
+from backend.src.sessions import create_session, set_assets, append_messages
+from backend.src.greenpt import get_client, close_client
+
+# Answers accepted at the prompts, compared after .strip().lower()
+_YES_TOKENS = frozenset({"y", "yes"})
+_EXIT_TOKENS = frozenset({"", "quit", "exit"})
+
+SAMPLES_PATH = Path(__file__).with_name("test_samples.json")
+
+
+@lru_cache(maxsize=1)
+def load_samples() -> tuple[dict[str, str], ...]:
+    """Canned CV scenarios from `test_samples.json`, read on first use."""
+    return tuple(orjson.loads(SAMPLES_PATH.read_bytes()))
+
+
+async def run_sample_eval(sample: dict[str, str]) -> tuple[str, bool]:
+    """Evaluate one sample; returns (text to print, whether it succeeded).
+
+    Output is returned rather than printed so concurrent evaluations don't
+    interleave on stdout.
+    """
+    header = f"\n=== {sample['name']} ==="
     try:
         result = await evaluate_cv(
             cv_text=sample["cv_text"],
@@ -95,33 +55,49 @@ async def run_sample(sample: dict[str, str]) -> None:
             company_info=sample["company_info"],
         )
     except HTTPException as exc:
-        print(f"Evaluation failed [{exc.status_code}]: {exc.detail}")
-        return
+        return f"{header}\nEvaluation failed [{exc.status_code}]: {exc.detail}", False
     except Exception as exc:  # pragma: no cover - ensure unexpected errors surface clearly
-        print(f"Evaluation failed: {exc}")
-        return
+        return f"{header}\nEvaluation failed: {exc}", False
 
     reply = result.get("reply", "(no reply)")
-    print(reply)
+    return f"{header}\n{reply}", True
+
+
+async def run_all_samples(samples) -> list[tuple[str, bool]]:
+    """Evaluate every sample in one concurrent batch, in sample order."""
+    return await asyncio.gather(*(run_sample_eval(sample) for sample in samples))
 
-    if prompt_continue():
-        await run_interactive_interview(sample)
 
+@lru_cache(maxsize=1)
+def _prompt_session():
+    return PromptSession()
 
-def prompt_continue() -> bool:
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line without blocking the event loop.
+
+    Uses prompt_toolkit's coroutine-native prompt when it is installed,
+    otherwise `input()` on a worker thread.
+    """
+    if PromptSession is not None:
+        return await _prompt_session().prompt_async(prompt)
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def prompt_continue() -> bool:
     """Ask the user if they want to enter the live interview loop."""
 
-    choice = input("Start interactive interview? [y/N]: ").strip().lower()
-    return choice in {"y", "yes"}
+    choice = (await ainput("Start interactive interview? [y/N]: ")).strip().lower()
+    return choice in _YES_TOKENS
 
 
 async def run_interactive_interview(sample: dict[str, str]) -> None:
     """Spin up an interview session in the terminal using the current system prompt."""
 
     base_prompt = prompt_store.DEFAULT_PROMPT
-    session = create_session(system_prompt=base_prompt)
-    session = set_assets(
-        session.id,
+    session = await create_session(system_prompt=base_prompt)
+    await set_assets(
+        session,
         cv=sample["cv_text"],
         job_description=sample["job_description"],
         company_info=sample["company_info"],
@@ -129,74 +105,113 @@ async def run_interactive_interview(sample: dict[str, str]) -> None:
     )
 
     # Kick off the chat by asking the assistant to begin the interview.
-    append_message(
-        session.id,
-        role="user",
-        content="Please begin the interview based on the provided materials.",
-    )
+    opening = "Please begin the interview based on the provided materials."
+    if await _safe_send(session, opening, "Interview start failed") is None:
+        return
+
+    while True:
+        user_text = (await ainput("You: ")).strip()
+        if user_text.lower() in _EXIT_TOKENS:
+            print("Conversation ended.\n")
+            break
+
+        # the previous turn must be in the history before this answer
+        await flush_writes()
+        if await _safe_send(session, user_text, "Assistant error") is None:
+            break
+
 
+async def _safe_send(session, pending_user: str, label: str) -> str | None:
+    """Stream the reply to `pending_user`; on failure print `label` with the error and return None."""
     try:
-        first_reply = await send_chat(session)
+        return await stream_chat(session, pending_user)
     except HTTPException as exc:
-        print(f"Interview start failed [{exc.status_code}]: {exc.detail}")
-        return
+        print(f"{label} [{exc.status_code}]: {exc.detail}")
     except Exception as exc:  # pragma: no cover - keep unexpected errors visible
-        print(f"Interview start failed: {exc}")
-        return
+        print(f"{label}: {exc}")
+    return None
 
-    print(f"Interviewer: {first_reply}")
 
-    while True:
-        user_text = input("You: ").strip()
-        if user_text.lower() in {"", "quit", "exit"}:
-            print("Conversation ended.\n")
-            break
+# Each turn (the user message and the reply to it) is saved by a background
+# writer in one append, so the store write doesn't hold up the terminal; the
+# queue keeps turns in order, and flush_writes() is awaited before anything
+# else touches the history.
+_WRITE_Q: asyncio.Queue = asyncio.Queue()
+_writer_task: asyncio.Task | None = None
 
-        append_message(session.id, role="user", content=user_text)
 
+async def _writer() -> None:
+    while True:
+        session, entries = await _WRITE_Q.get()
         try:
-            reply = await send_chat(session)
-        except HTTPException as exc:
-            print(f"Assistant error [{exc.status_code}]: {exc.detail}")
-            break
-        except Exception as exc:  # pragma: no cover
-            print(f"Assistant error: {exc}")
-            break
+            await append_messages(session, entries)
+        except Exception as exc:  # pragma: no cover - keep unexpected errors visible
+            print(f"Failed to save messages: {exc}")
+        finally:
+            _WRITE_Q.task_done()
 
-        print(f"Interviewer: {reply}")
 
+def queue_turn(session, pending_user: str, assistant_text: str) -> None:
+    """Append a user message and its reply to the session in the background, in queue order."""
+    global _writer_task
+    if _writer_task is None:
+        _writer_task = asyncio.create_task(_writer())
+    _WRITE_Q.put_nowait((session, [("user", pending_user), ("assistant", assistant_text)]))
 
-async def send_chat(session) -> str:
-    """Send the current session history to GreenPT and capture the assistant reply."""
 
-    client = get_client()
-    resp = await client.chat([m.dict() for m in session.messages])
+async def flush_writes() -> None:
+    """Wait until every queued message has been appended."""
+    await _WRITE_Q.join()
 
-    assistant_text = extract_assistant_text(resp)
-    append_message(session.id, role="assistant", content=assistant_text)
-    return assistant_text
 
+async def stop_writer() -> None:
+    global _writer_task
+    await flush_writes()
+    if _writer_task is not None:
+        _writer_task.cancel()
+        _writer_task = None
 
-def extract_assistant_text(resp) -> str:
-    """Mirror backend parsing logic to recover assistant text from GreenPT."""
 
-    assistant_text = ""
-    if isinstance(resp, dict):
-        choices = resp.get("choices") or []
-        if choices:
-            first = choices[0]
-            if isinstance(first, dict) and "message" in first and isinstance(first["message"], dict):
-                assistant_text = first["message"].get("content", "")
-            else:
-                assistant_text = first.get("text", "")
+def _with_pending(session, pending_user: str) -> list[dict[str, str]]:
+    # chat_messages is the session's serialized history, extended per append,
+    # so only the not-yet-saved user message is added here
+    return [*session.chat_messages, {"role": "user", "content": pending_user}]
 
-    if not assistant_text and isinstance(resp, dict):
-        assistant_text = resp.get("text", "") or resp.get("response", "")
 
+async def stream_chat(session, pending_user: str) -> str:
+    """Send the history plus `pending_user` to GreenPT, printing the reply as it is generated.
+
+    Both messages are saved to the session together once the reply is in.
+    """
+
+    messages = _with_pending(session, pending_user)
+    client = get_client()
+    buffer = io.StringIO()
+    print("Interviewer: ", end="", flush=True)
+    try:
+        async for chunk in client.chat_stream(messages):
+            delta = extract_delta_text(chunk)
+            if delta:
+                print(delta, end="", flush=True)
+                buffer.write(delta)
+    finally:
+        print()
+
+    assistant_text = buffer.getvalue().strip()
     if not assistant_text:
         raise HTTPException(status_code=502, detail="GreenPT returned an empty interview reply.")
 
-    return assistant_text.strip()
+    queue_turn(session, pending_user, assistant_text)
+    return assistant_text
+
+
+def extract_delta_text(chunk) -> str:
+    """Text carried by one streamed chunk (`choices[0].delta.content`), or ""."""
+
+    try:
+        return chunk["choices"][0]["delta"].get("content") or ""
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return ""
 
 
 def ensure_api_key() -> None:
@@ -208,9 +223,27 @@ def ensure_api_key() -> None:
 
 async def main() -> None:
     ensure_api_key()
-    for sample in SAMPLES:
-        await run_sample(sample)
+    # Every call shares get_client()'s pooled HTTP/2 connection; close it on
+    # the way out so the loop doesn't end with the connection still open
+    try:
+        # The evaluations are independent network calls, so run them together;
+        # the interactive prompts that follow have to stay sequential
+        samples = load_samples()
+        results = await run_all_samples(samples)
+        for sample, (output, ok) in zip(samples, results):
+            print(output)
+            if ok and await prompt_continue():
+                await run_interactive_interview(sample)
+    finally:
+        await stop_writer()
+        await close_client()
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # installed with uvicorn[standard]
+    except ImportError:
+        pass
+    else:
+        uvloop.install()
     asyncio.run(main())